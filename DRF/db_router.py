@@ -0,0 +1,47 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Направляет чтение внутри блока на реплики из DATABASE_REPLICAS.
+
+    После первой записи внутри блока чтение возвращается на основную базу, чтобы запрос видел свои изменения.
+    Можно использовать и как декоратор.
+    """
+    replica_token = _read_from_replica.set(True)
+    pinned_token = _pinned_to_primary.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(replica_token)
+        _pinned_to_primary.reset(pinned_token)
+
+
+class PrimaryReplicaRouter:
+    """
+            Роутер, который отправляет запись на основную базу, а чтение внутри read_from_replica() на реплики.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or _pinned_to_primary.get() or not settings.DATABASE_REPLICAS:
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if _read_from_replica.get():
+            _pinned_to_primary.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import threading
+import uuid
+
+import redis
+from celery import Task
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_PREFIX = 'celery:idempotency'
+# Заголовок сообщения с ключом: аргументы задачи Celery сверяет с её сигнатурой
+IDEMPOTENCY_HEADER = 'idempotency_key'
+
+# Продление и снятие блокировки только её владельцем: за время выполнения блокировка могла истечь
+# и достаться другому воркеру
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def make_idempotency_key(*parts):
+    """Строит ключ идемпотентности из частей, однозначно описывающих работу задачи."""
+    return hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+class RedisIdempotencyStore:
+    """Блокировки и отметки о выполнении в Redis, общие для всех воркеров."""
+
+    def __init__(self, client):
+        self.client = client
+        self.extend_script = client.register_script(EXTEND_LOCK_SCRIPT)
+        self.release_script = client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def is_done(self, key):
+        return bool(self.client.exists(key))
+
+    def mark_done(self, key, ttl):
+        self.client.set(key, 1, ex=ttl)
+
+    def acquire(self, key, token, ttl):
+        return bool(self.client.set(key, token, nx=True, px=ttl * 1000))
+
+    def extend(self, key, token, ttl):
+        return bool(self.extend_script(keys=[key], args=[token, ttl * 1000]))
+
+    def release(self, key, token):
+        self.release_script(keys=[key], args=[token])
+
+
+class CacheIdempotencyStore:
+    """
+            Блокировки и отметки о выполнении в кеше Django.
+
+            Используется, только если IDEMPOTENCY_REDIS_URL не задан (тесты): с локальным кешем
+            защита действует в пределах одного процесса.
+    """
+
+    def is_done(self, key):
+        return bool(cache.get(key))
+
+    def mark_done(self, key, ttl):
+        cache.set(key, 1, ttl)
+
+    def acquire(self, key, token, ttl):
+        return cache.add(key, token, ttl)
+
+    def extend(self, key, token, ttl):
+        return cache.get(key) == token and cache.touch(key, ttl)
+
+    def release(self, key, token):
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+_store = None
+
+
+def get_idempotency_store():
+    global _store
+
+    if not settings.IDEMPOTENCY_REDIS_URL:
+        return CacheIdempotencyStore()
+    if _store is None:
+        _store = RedisIdempotencyStore(redis.Redis.from_url(settings.IDEMPOTENCY_REDIS_URL, decode_responses=True))
+    return _store
+
+
+class LockRenewer(threading.Thread):
+    """Продлевает блокировку, пока выполняется задача, чтобы её можно было держать короткой."""
+
+    def __init__(self, store, key, token, ttl):
+        super().__init__(daemon=True)
+        self.store, self.key, self.token, self.ttl = store, key, token, ttl
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.ttl / 3):
+            try:
+                if not self.store.extend(self.key, self.token, self.ttl):
+                    logger.warning('Блокировка %s потеряна во время выполнения задачи', self.key)
+                    return
+            except redis.RedisError:
+                logger.warning('Не удалось продлить блокировку %s', self.key, exc_info=True)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class IdempotentTask(Task):
+    """
+            Базовый класс задачи, которая выполняется не более одного раза на ключ идемпотентности.
+
+            Ключ передаётся в заголовке сообщения (см. delay_idempotent), иначе используется id задачи,
+            что защищает от повторной доставки того же сообщения; при retry заголовки сохраняются.
+            Пока задача выполняется, ключ удерживает блокировку в Redis (SET NX PX) на IDEMPOTENCY_LOCK_TTL секунд, которую продлевает фоновый поток;
+            после успеха ключ помечается выполненным на idempotency_ttl секунд. Если блокировка занята,
+            задача откладывается через retry, а не отбрасывается: блокировка упавшего воркера истекает
+            быстро, и повторная доставка выполнит работу.
+
+            Атрибуты:
+                idempotency_ttl : Сколько секунд помнить выполненный ключ.
+                idempotency_max_retries : Сколько раз откладывать задачу, пока блокировка занята.
+    """
+    idempotency_ttl = 24 * 60 * 60
+    idempotency_max_retries = 10
+
+    def delay_idempotent(self, idempotency_key, *args, **kwargs):
+        """Ставит задачу, как delay, с ключом идемпотентности в заголовке сообщения."""
+        return self.apply_async(args, kwargs, headers={IDEMPOTENCY_HEADER: idempotency_key})
+
+    def __call__(self, *args, **kwargs):
+        key = (self.request.headers or {}).get(IDEMPOTENCY_HEADER) or self.request.id
+        if key is None:
+            return super().__call__(*args, **kwargs)
+
+        store = get_idempotency_store()
+        done_key = f'{IDEMPOTENCY_KEY_PREFIX}:{self.name}:{key}:done'
+        lock_key = f'{IDEMPOTENCY_KEY_PREFIX}:{self.name}:{key}:lock'
+        lock_ttl = settings.IDEMPOTENCY_LOCK_TTL
+
+        if store.is_done(done_key):
+            logger.info('Задача %s с ключом %s уже выполнена, пропускаем', self.name, key)
+            return None
+
+        token = uuid.uuid4().hex
+        if not store.acquire(lock_key, token, lock_ttl):
+            logger.info('Задача %s с ключом %s выполняется, откладываем', self.name, key)
+            raise self.retry(countdown=lock_ttl, max_retries=self.idempotency_max_retries)
+
+        # Ключ мог быть выполнен другим воркером между проверкой и захватом блокировки
+        if store.is_done(done_key):
+            store.release(lock_key, token)
+            logger.info('Задача %s с ключом %s уже выполнена, пропускаем', self.name, key)
+            return None
+
+        renewer = LockRenewer(store, lock_key, token, lock_ttl)
+        renewer.start()
+        try:
+            result = super().__call__(*args, **kwargs)
+            store.mark_done(done_key, self.idempotency_ttl)
+            return result
+        finally:
+            renewer.stop()
+            store.release(lock_key, token)
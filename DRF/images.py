@@ -0,0 +1,116 @@
+import os
+from io import BytesIO
+
+from celery import signature
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+VARIANTS_DIR = 'variants'
+# Задача указана по имени: общий модуль не зависит от приложения, в котором она объявлена
+GENERATE_VARIANTS_TASK = 'course.tasks.generate_image_variants'
+
+
+def has_new_upload(field_file):
+    """Файл загружен в этом запросе и ещё не сохранён в хранилище."""
+    return bool(field_file) and not field_file._committed
+
+
+def schedule_image_variants(instance, field_name):
+    """Ставит генерацию превью в очередь после фиксации транзакции, в которой сохранён объект."""
+    task = signature(GENERATE_VARIANTS_TASK, args=(instance._meta.label, instance.pk, field_name))
+    transaction.on_commit(task.delay)
+
+
+def variant_path(name, variant):
+    directory, filename = os.path.split(name)
+    base, _ = os.path.splitext(filename)
+    return os.path.join(directory, VARIANTS_DIR, f'{base}_{variant}.jpg')
+
+
+def generate_variants(field_file):
+    """
+            Создаёт уменьшенные и пережатые в JPEG копии изображения для каждого размера из IMAGE_VARIANTS.
+
+            Returns:
+                dict: Путь к файлу в хранилище для каждого варианта.
+    """
+    storage = field_file.storage
+
+    with field_file.open('rb') as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    variants = {}
+    for variant, size in settings.IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+
+        buffer = BytesIO()
+        resized.save(buffer, format='JPEG', quality=settings.IMAGE_VARIANT_QUALITY, optimize=True, progressive=True)
+
+        path = variant_path(field_file.name, variant)
+        if storage.exists(path):
+            storage.delete(path)
+        variants[variant] = storage.save(path, ContentFile(buffer.getvalue()))
+
+    return variants
+
+
+def variant_urls(field_file, variants, request=None):
+    if not field_file or not variants:
+        return {}
+
+    urls = {}
+    for variant, path in variants.items():
+        url = field_file.storage.url(path)
+        urls[variant] = request.build_absolute_uri(url) if request is not None else url
+    return urls
+
+
+def validator_image(file):
+    """
+    Проверяет размер и разрешение изображения.
+
+    Pillow читает только заголовок файла, само изображение декодируется позже, в фоновой задаче.
+    """
+    if file.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise serializers.ValidationError('Файл изображения слишком большой')
+
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        # DecompressionBombError не наследует OSError: заголовок обещает слишком много пикселей
+        raise serializers.ValidationError('Загрузите корректное изображение')
+    finally:
+        file.seek(0)
+
+    max_width, max_height = settings.IMAGE_MAX_DIMENSIONS
+    if width > max_width or height > max_height:
+        raise serializers.ValidationError(f'Разрешение изображения не должно превышать {max_width}x{max_height}')
+
+
+class StreamingImageField(serializers.FileField):
+    """
+    Поле изображения, которое проверяет только заголовок файла.
+
+    В отличие от ImageField не декодирует изображение целиком в потоке запроса.
+    """
+    default_validators = [validator_image]
+
+
+class ImageVariantsField(serializers.Field):
+    """Ссылки на уменьшенные копии изображения из поля image_field."""
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(getattr(value, self.image_field), getattr(value, self.field_name),
+                            self.context.get('request'))
@@ -0,0 +1,93 @@
+import hashlib
+from collections import namedtuple
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+API_INFO = openapi.Info(
+    title="API Documentation",
+    default_version=settings.API_VERSION,
+    description="Your API description",
+    terms_of_service="https://www.example.com/policies/terms/",
+    contact=openapi.Contact(email="contact@example.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+SchemaDocument = namedtuple('SchemaDocument', ['content', 'etag'])
+
+# Сгенерированные схемы по версии API и сборке: схема строится один раз на процесс
+_documents = {}
+
+
+def get_schema_path(version, build_id):
+    return settings.OPENAPI_SCHEMA_DIR / f'openapi-{version}-{build_id}.json'
+
+
+def generate_schema(version):
+    """Строит OpenAPI-схему всего API в JSON, обходя все представления и сериализаторы."""
+    generator = OpenAPISchemaGenerator(API_INFO, version)
+    schema = generator.get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def make_document(content, build_id=''):
+    digest = hashlib.sha256(content).hexdigest()
+    return SchemaDocument(content, f'"{build_id}-{digest}"' if build_id else f'"{digest}"')
+
+
+def get_schema_document(version=None):
+    """
+            Возвращает схему для версии API.
+
+            Схема берётся из памяти процесса, затем из файла, записанного командой generate_openapi_schema,
+            и только если их нет, генерируется заново. Файл читается, только если задан BUILD_ID: имя файла
+            содержит версию API и сборку, поэтому схема, сгенерированная для другого кода, не используется.
+    """
+    version = version or settings.API_VERSION
+    build_id = settings.BUILD_ID
+
+    if (version, build_id) not in _documents:
+        path = get_schema_path(version, build_id) if build_id else None
+        content = path.read_bytes() if path and path.exists() else generate_schema(version)
+        _documents[version, build_id] = make_document(content, build_id)
+
+    return _documents[version, build_id]
+
+
+def clear_schema_cache():
+    _documents.clear()
+
+
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+
+class CachedSchemaView(schema_view):
+    """
+            Представление документации, отдающее JSON-схему из кеша с поддержкой ETag.
+
+            Веб-интерфейсы (swagger, redoc) и YAML по-прежнему отрисовывает drf_yasg.
+    """
+
+    def get(self, request, version='', format=None):
+        if not isinstance(request.accepted_renderer, (OpenAPIRenderer, SwaggerJSONRenderer)):
+            return super().get(request, version, format)
+
+        document = get_schema_document(request.version or version or None)
+
+        response = get_conditional_response(request, etag=document.etag)
+        if response is None:
+            response = HttpResponse(document.content, content_type=request.accepted_renderer.media_type)
+        response['ETag'] = document.etag
+        patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+        return response
@@ -2,8 +2,8 @@ import os
 from datetime import timedelta
 
 from dotenv import load_dotenv
+from kombu import Queue
 from pathlib import Path
-import sys
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -30,10 +30,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'drf_yasg',
     'users',
     'course',
     'rest_framework',
+    'rest_framework.authtoken',
     'rest_framework_simplejwt',
     'django_celery_beat',
 
@@ -79,10 +81,31 @@ DATABASES = {
         'NAME': os.getenv('DATABASES_NAME'),
         'USER': 'postgres',
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
+        'HOST': os.getenv('DATABASES_HOST', ''),
+        'PORT': os.getenv('DATABASES_PORT', ''),
     }
 }
-if 'test' in sys.argv or 'test\_coverage' in sys.argv:
-    DATABASES['default']['NAME'] = ':memory:'
+# Реплики для чтения: хосты через запятую, остальные параметры подключения как у основной базы
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DATABASES_REPLICA_HOSTS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['DRF.db_router.PrimaryReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHE_ENABLED = os.getenv('CACHE_ENABLED') == 'True'
+
+if CACHE_ENABLED:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_LOCATION'),
+        }
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -102,6 +125,18 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Первым идёт PBKDF2 с настраиваемым числом итераций: стоимость хеширования
+# определяет пропускную способность эндпоинта входа на одно ядро.
+PASSWORD_HASHERS = [
+    'users.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 600000))
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -118,6 +153,21 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Загрузки крупнее этого размера пишутся во временный файл, а не держатся в памяти
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+
+# Изображения: ограничения загрузки и размеры превью, которые генерирует фоновая задача
+IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_DIMENSIONS = (6000, 6000)
+IMAGE_VARIANTS = {
+    'thumb': (160, 160),
+    'medium': (640, 640),
+}
+IMAGE_VARIANT_QUALITY = 80
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
@@ -136,22 +186,62 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    'DEFAULT_THROTTLE_CLASSES': [
+        'DRF.throttling.SlidingWindowThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.getenv('THROTTLE_RATE_ANON', '100/min'),
+        'user': os.getenv('THROTTLE_RATE_USER', '1000/min'),
+        'course': os.getenv('THROTTLE_RATE_COURSE', '120/min'),
+        'login': os.getenv('THROTTLE_RATE_LOGIN', '10/min'),
+    },
 }
 
+# Redis для счётчиков ограничения частоты запросов; без него используется кеш Django
+THROTTLE_REDIS_URL = os.getenv('THROTTLE_REDIS_URL')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# Время жизни ключа токена в кеше и минимальный интервал обновления last_login при входе
+AUTH_TOKEN_CACHE_TIMEOUT = 60 * 60
+# Ключ токена кешируется только в общем для всех процессов кеше (Redis): в локальном кеше процесса удаление
+# токена не сбросило бы его копии в других воркерах
+AUTH_TOKEN_CACHE_ENABLED = CACHE_ENABLED
+LAST_LOGIN_UPDATE_INTERVAL = timedelta(hours=1)
+
+# Начиная с этого числа строк (по статистике Postgres) админка не считает точный COUNT для таблицы без фильтров
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000))
+
+# Версия API: от неё зависит файл и кеш OpenAPI-схемы документации
+API_VERSION = os.getenv('API_VERSION', 'v1')
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
+# Идентификатор сборки (например, хеш коммита): схема с диска используется только для той сборки, для которой
+# сгенерирована; без него схема строится в памяти процесса из текущего кода
+BUILD_ID = os.getenv('BUILD_ID', '')
+OPENAPI_SCHEMA_MAX_AGE = 60 * 60
+
 STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
+STRIPE_API_BASE = os.getenv('STRIPE_API_BASE', 'https://api.stripe.com')
+STRIPE_TIMEOUT = 10
 
 # URL-адрес брокера сообщений
 CELERY_BROKER_URL = 'redis://localhost:6379' # Например, Redis, который по умолчанию работает на порту 6379
 
+# Redis для ключей идемпотентности задач: общий для всех воркеров; блокировка ключа продлевается,
+# пока задача выполняется, и истекает через IDEMPOTENCY_LOCK_TTL секунд после падения воркера
+IDEMPOTENCY_REDIS_URL = os.getenv('IDEMPOTENCY_REDIS_URL', CELERY_BROKER_URL)
+IDEMPOTENCY_LOCK_TTL = int(os.getenv('IDEMPOTENCY_LOCK_TTL', 60))
+
 # URL-адрес брокера результатов, также Redis
 CELERY_RESULT_BACKEND = 'redis://localhost:6379'
 
+# Время хранения результатов задач в бэкенде; задачи без полезного результата объявлены с ignore_result
+CELERY_RESULT_EXPIRES = timedelta(hours=int(os.getenv('CELERY_RESULT_EXPIRES_HOURS', 1)))
+
 # Часовой пояс для работы Celery
 CELERY_TIMEZONE = "Australia/Tasmania"
 
@@ -161,11 +251,57 @@ CELERY_TASK_TRACK_STARTED = True
 # Максимальное время на выполнение задачи
 CELERY_TASK_TIME_LIMIT = 30 * 60
 
+# Очереди задач: массовые рассылки не должны задерживать служебные и платёжные задачи
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('default'),
+    Queue('notifications'),
+    Queue('billing'),
+    Queue('maintenance'),
+)
+CELERY_TASK_ROUTES = {
+    'course.tasks.course_update_mail': {'queue': 'notifications'},
+    'course.tasks.stripe_*': {'queue': 'billing'},
+    'course.tasks.check_inactive_users': {'queue': 'maintenance'},
+    'course.tasks.relay_outbox_events': {'queue': 'maintenance'},
+    'course.tasks.purge_outbox_events': {'queue': 'maintenance'},
+}
+
+# Ограничения частоты выполнения задач на одного воркера
+CELERY_TASK_ANNOTATIONS = {
+    'course.tasks.course_update_mail': {'rate_limit': os.getenv('CELERY_MAIL_RATE_LIMIT', '60/m')},
+}
+
+# Подтверждение после выполнения: задача упавшего воркера вернётся в очередь,
+# а воркер не забирает из очереди больше, чем успевает выполнить
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Воркер, слушающий несколько очередей, разбирает их в порядке перечисления в -Q
+CELERY_BROKER_TRANSPORT_OPTIONS = {'queue_order_strategy': 'priority'}
+
+# Размер пачки и период разбора событий outbox
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))
+OUTBOX_RELAY_INTERVAL = int(os.getenv('OUTBOX_RELAY_INTERVAL', 5))
+# Сколько дней хранить обработанные события
+OUTBOX_RETENTION_DAYS = int(os.getenv('OUTBOX_RETENTION_DAYS', 7))
+
 CELERY_BEAT_SCHEDULE = {
     'check_inactive_users': {
-        'task': 'main.tasks.check_inactive_users',
+        'task': 'course.tasks.check_inactive_users',
         'schedule': timedelta(minutes=10),
     },
+    'relay_outbox_events': {
+        'task': 'course.tasks.relay_outbox_events',
+        'schedule': timedelta(seconds=OUTBOX_RELAY_INTERVAL),
+        # Пока воркер недоступен, запуски не копятся в очереди: следующий разберёт все события
+        'options': {'expires': OUTBOX_RELAY_INTERVAL},
+    },
+    'purge_outbox_events': {
+        'task': 'course.tasks.purge_outbox_events',
+        'schedule': timedelta(days=1),
+    },
 }
 
 EMAIL_HOST = 'smtp.gmail.com'
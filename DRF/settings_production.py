@@ -0,0 +1,33 @@
+"""
+Production-профиль настроек.
+
+Включается переменной окружения DJANGO_SETTINGS_MODULE=DRF.settings_production.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost').split(',')
+CSRF_TRUSTED_ORIGINS = [origin for origin in os.getenv('CSRF_TRUSTED_ORIGINS', '').split(',') if origin]
+
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SESSION_COOKIE_SECURE = os.getenv('SECURE_COOKIES', 'True') == 'True'
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
+
+# Постоянные соединения с базой: соединение переиспользуется между запросами одного потока,
+# а перед повторным использованием проверяется, что оно живо.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.getenv('DATABASES_CONN_MAX_AGE', 600))
+    database['CONN_HEALTH_CHECKS'] = True
+
+    # При работе через pgbouncer в режиме transaction pooling серверные курсоры недоступны
+    if os.getenv('PGBOUNCER') == 'True':
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+    # Постоянные соединения не переживают смену потоков в ASGI-режиме, поэтому там пулом служит pgbouncer
+    if os.getenv('GUNICORN_WORKER_CLASS') == 'uvicorn.workers.UvicornWorker':
+        database['CONN_MAX_AGE'] = 0
@@ -0,0 +1,49 @@
+"""
+Профиль настроек для тестов.
+
+manage.py включает его сам для команды test, в остальных случаях — DJANGO_SETTINGS_MODULE=DRF.settings_test.
+По умолчанию тесты идут на SQLite в памяти и запускаются параллельно: python manage.py test --parallel.
+С TEST_DATABASES_ENGINE=postgresql используется Postgres из основных настроек, тестовые базы создаются
+из шаблона TEST_DATABASES_TEMPLATE (например, с заранее установленными расширениями).
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+SECRET_KEY = os.getenv('SECRET_KEY') or 'test-secret-key'
+
+if os.getenv('TEST_DATABASES_ENGINE') == 'postgresql':
+    DATABASES['default']['TEST'] = {'TEMPLATE': os.getenv('TEST_DATABASES_TEMPLATE')}
+    # Отдельная база, на которой тесты эмулируют реплику (включается через DATABASE_REPLICAS)
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {**DATABASES['default']['TEST'], 'NAME': 'test_replica'}}
+else:
+    DATABASES = {
+        'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+        'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    }
+
+# Реплики из DATABASES_REPLICA_HOSTS окружения в тестах не используются: тесты включают 'replica' сами
+DATABASE_REPLICAS = []
+
+# Хеширование паролей с настоящей стоимостью занимает большую часть времени тестов с пользователями
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Тесты идут в одном процессе, поэтому локального кеша для токенов достаточно
+AUTH_TOKEN_CACHE_ENABLED = True
+THROTTLE_REDIS_URL = None
+IDEMPOTENCY_REDIS_URL = None
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Задачи выполняются сразу в процессе теста, без брокера
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BROKER_URL = 'memory://'
+CELERY_RESULT_BACKEND = 'cache+memory://'
@@ -0,0 +1,140 @@
+import logging
+import time
+import uuid
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# Проверяет все окна запроса за один вызов: если хотя бы одно переполнено, запрос не учитывается
+# и возвращается время ожидания в миллисекундах, иначе запрос добавляется во все окна и возвращается 0.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2 + 1])
+    local window = tonumber(ARGV[i * 2 + 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local oldest_score = tonumber(oldest[2]) or now
+        wait = math.max(wait, oldest_score + window - now)
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, tonumber(ARGV[i * 2 + 2]))
+end
+return 0
+"""
+
+_redis_client = None
+_sliding_window_script = None
+
+
+def get_redis_client():
+    global _redis_client, _sliding_window_script
+
+    if not settings.THROTTLE_REDIS_URL:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.THROTTLE_REDIS_URL, socket_timeout=0.5)
+        _sliding_window_script = _redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+    return _redis_client
+
+
+def parse_rate(rate):
+    """Разбирает частоту в формате DRF ('100/min') в пару (число запросов, окно в секундах)."""
+    num, period = rate.split('/')
+    duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+    return int(num), duration
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+            Ограничение частоты запросов скользящим окном.
+
+            Для каждого запроса проверяются окна пользователя ('user') или IP-адреса анонима ('anon'),
+            а также окно представления, если у него задан throttle_scope. Частоты берутся из
+            REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']. С THROTTLE_REDIS_URL все окна проверяются одним
+            Lua-скриптом, то есть за одно обращение к Redis; без него используется кеш Django.
+            При недоступности Redis запросы пропускаются.
+    """
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_windows(self, request, view):
+        if request.user and request.user.is_authenticated:
+            scopes, ident = ['user'], request.user.pk
+        else:
+            scopes, ident = ['anon'], self.get_ident(request)
+
+        view_scope = getattr(view, 'throttle_scope', None)
+        if view_scope:
+            scopes.append(view_scope)
+
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        windows = []
+        for scope in scopes:
+            if rates.get(scope):
+                num_requests, duration = parse_rate(rates[scope])
+                windows.append((self.cache_format % {'scope': scope, 'ident': ident}, num_requests, duration))
+        return windows
+
+    def allow_request(self, request, view):
+        windows = self.get_windows(request, view)
+        if not windows:
+            return True
+
+        try:
+            client = get_redis_client()
+            if client is not None:
+                self.wait_seconds = self.check_redis(client, windows)
+            else:
+                self.wait_seconds = self.check_cache(windows)
+        except redis.RedisError:
+            logger.warning('Redis недоступен, ограничение частоты запросов пропущено', exc_info=True)
+            return True
+
+        return self.wait_seconds == 0
+
+    def check_redis(self, client, windows):
+        now = int(time.time() * 1000)
+        args = [now, f'{now}-{uuid.uuid4().hex}']
+        for key, num_requests, duration in windows:
+            args.extend([num_requests, duration * 1000])
+
+        wait = _sliding_window_script(keys=[key for key, _, _ in windows], args=args, client=client)
+        return int(wait) / 1000
+
+    def check_cache(self, windows):
+        # Чтение и запись истории не атомарны: без Redis лимит приблизительный при параллельных запросах
+        now = time.time()
+        histories = []
+        wait = 0
+
+        for key, num_requests, duration in windows:
+            history = [timestamp for timestamp in cache.get(key, []) if timestamp > now - duration]
+            if len(history) >= num_requests:
+                wait = max(wait, min(history) + duration - now)
+            histories.append((key, history, duration))
+
+        if wait > 0:
+            return wait
+
+        for key, history, duration in histories:
+            cache.set(key, history + [now], duration)
+        return 0
+
+    def wait(self):
+        return self.wait_seconds
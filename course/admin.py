@@ -1,7 +1,43 @@
 from django.contrib import admin
 
-from .models import User, Payment, Course
+from .models import User, Payment, Course, Lesson, Subscription
+from .paginators import EstimatedCountPaginator
 
 admin.site.register(User)
-admin.site.register(Payment)
-admin.site.register(Course)
\ No newline at end of file
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    list_display = ('title', 'owner', 'price')
+    list_select_related = ('owner',)
+    raw_id_fields = ('owner',)
+    search_fields = ('title',)
+    show_full_result_count = False
+
+
+@admin.register(Lesson)
+class LessonAdmin(admin.ModelAdmin):
+    list_display = ('title', 'course', 'owner')
+    list_select_related = ('course', 'owner')
+    raw_id_fields = ('course', 'owner')
+    search_fields = ('title',)
+    show_full_result_count = False
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'course', 'lesson', 'amount', 'payment_method')
+    list_select_related = ('user', 'course', 'lesson')
+    # Фильтры только по индексированным полям
+    list_filter = ('payment_method', 'date')
+    raw_id_fields = ('user', 'course', 'lesson')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(admin.ModelAdmin):
+    list_select_related = ('user', 'course')
+    raw_id_fields = ('user', 'course')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import math
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from course.permissions import IsOwner, IsModerator
+from .models import Course, Lesson, Subscription
+from .serializers import CourseBaseSerializer
+from .services import astripe_get_link
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIView(View):
+    """
+            Базовое асинхронное представление для эндпоинтов, которые ждут внешние сервисы.
+
+            Аутентификация и проверка прав выполняются теми же классами, что и в синхронных представлениях DRF,
+            но ожидание ответа (Stripe, база) не занимает поток воркера.
+
+            Атрибуты:
+                permission_classes : Классы разрешений DRF.
+                throttle_scope : Область ограничения частоты запросов.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # CSRF для сессионной аутентификации проверяет SessionAuthentication, как в APIView
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        self.request = request
+        try:
+            await sync_to_async(self.authenticate_and_throttle)(request)
+            for permission in self.get_permissions():
+                if not permission.has_permission(request, self):
+                    return self.permission_denied(permission)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+            if getattr(exc, 'wait', None):
+                response['Retry-After'] = str(math.ceil(exc.wait))
+            return response
+
+    def authenticate_and_throttle(self, request):
+        request.user
+        waits = [throttle.wait() for throttle in self.get_throttles() if not throttle.allow_request(request, self)]
+        if waits:
+            raise Throttled(max(waits))
+
+    def get_throttles(self):
+        return [throttle() for throttle in api_settings.DEFAULT_THROTTLE_CLASSES]
+
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+
+    def check_object_permissions(self, obj):
+        for permission in self.get_permissions():
+            if not permission.has_object_permission(self.request, self, obj):
+                return self.permission_denied(permission)
+        return None
+
+    def permission_denied(self, permission):
+        if not self.request.user.is_authenticated:
+            return JsonResponse({'detail': 'Учетные данные не были предоставлены.'},
+                                status=status.HTTP_401_UNAUTHORIZED)
+        return JsonResponse({'detail': getattr(permission, 'message', 'Доступ запрещён.')},
+                            status=status.HTTP_403_FORBIDDEN)
+
+    @staticmethod
+    def not_found():
+        return JsonResponse({'detail': 'Не найдено.'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class CourseRetrieveAsyncView(AsyncAPIView):
+    """
+            Асинхронное получение деталей курса вместе с количеством уроков и подпиской.
+
+            Returns:
+                JsonResponse: Данные курса в том же формате, что и CourseViewSet.retrieve.
+    """
+    permission_classes = [IsOwner | IsModerator | IsAdminUser]
+    throttle_scope = 'course'
+
+    async def get(self, request, pk):
+        try:
+            course = await Course.objects.select_related('owner').aget(pk=pk)
+        except Course.DoesNotExist:
+            return self.not_found()
+
+        denied = self.check_object_permissions(course)
+        if denied:
+            return denied
+
+        lesson_count, is_subscribed = await asyncio.gather(
+            Lesson.objects.filter(course=course).acount(),
+            Subscription.objects.filter(user=request.user, course=course).aexists(),
+        )
+
+        data = CourseBaseSerializer(course, context={'request': request}).data
+        data.update(lesson_count=lesson_count, is_subscribed=is_subscribed)
+        return JsonResponse(data)
+
+
+class CoursePaymentLinkAsyncView(AsyncAPIView):
+    """
+            Ссылка на оплату курса.
+
+            Обычно её заранее создаёт задача stripe_create_payment_link; если ссылки ещё нет или она создана
+            для прежних названия или цены, она создаётся в Stripe асинхронно и сохраняется в курсе.
+
+            Returns:
+                JsonResponse: Ссылка на оплату.
+                HTTP_400_BAD_REQUEST: У курса нет цены.
+                HTTP_502_BAD_GATEWAY: Stripe недоступен или вернул ошибку.
+    """
+    throttle_scope = 'course'
+
+    async def get(self, request, pk):
+        try:
+            course = await Course.objects.aget(pk=pk)
+        except Course.DoesNotExist:
+            return self.not_found()
+
+        if not course.has_current_payment_link():
+            if not course.price:
+                return JsonResponse({'detail': 'У курса нет цены.'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                course.payment_link = await astripe_get_link(course)
+            except httpx.HTTPError:
+                logger.warning('Не удалось создать ссылку на оплату курса %s', pk, exc_info=True)
+                return JsonResponse({'detail': 'Платёжный сервис недоступен.'}, status=status.HTTP_502_BAD_GATEWAY)
+            await Course.objects.filter(pk=pk).aupdate(
+                payment_link=course.payment_link, payment_link_title=course.title, payment_link_price=course.price
+            )
+
+        return JsonResponse({'payment_link': course.payment_link})
+
+
+class SubscribeCourseAsyncView(AsyncAPIView):
+    """
+        Асинхронно создает подписку на выбранный курс.
+
+        Параметры:
+            course_id : Идентификатор курса.
+
+        Returns:
+            JsonResponse: Объект ответа с информацией о результате операции.
+                HTTP_400_BAD_REQUEST: Подписка уже есть.
+                HTTP_201_CREATED: Вы подписались на курс.
+    """
+
+    async def post(self, request, course_id):
+        try:
+            course = await Course.objects.aget(pk=course_id)
+        except Course.DoesNotExist:
+            return self.not_found()
+
+        if await Subscription.objects.filter(user=request.user, course=course).aexists():
+            return JsonResponse({'detail': 'Вы уже подписаны'}, status=status.HTTP_400_BAD_REQUEST)
+
+        await Subscription.objects.acreate(user=request.user, course=course)
+        return JsonResponse({'detail': 'Вы подписались на курс.'}, status=status.HTTP_201_CREATED)
@@ -1,5 +1,8 @@
 import django_filters
+from rest_framework.filters import BaseFilterBackend
+
 from .models import Payment
+from .search import search_queryset
 
 
 class PaymentFilter(django_filters.FilterSet):
@@ -18,3 +21,15 @@ class PaymentFilter(django_filters.FilterSet):
         model = Payment
         fields = ['course', 'lesson', 'payment_method']
 
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+            Фильтр полнотекстового поиска по названию и описанию (?search=).
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term:
+            return queryset
+        return search_queryset(queryset, term)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from course.models import Course
+from users.models import User
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    """Отвечает на запросы к Stripe API с заданной задержкой, имитируя сетевое ожидание."""
+    latency = 0.1
+    responses = {
+        '/v1/products': {'id': 'prod_fake'},
+        '/v1/prices': {'id': 'price_fake'},
+        '/v1/payment_links': {'id': 'plink_fake', 'object': 'payment_link', 'url': 'https://buy.stripe.com/fake'},
+    }
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.latency)
+        body = json.dumps(self.responses.get(self.path, {})).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает пропускную способность WSGI и ASGI на эндпоинте ссылки на оплату при медленном Stripe.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=25)
+        parser.add_argument('--threads', type=int, default=1, help='Число потоков синхронного воркера.')
+        parser.add_argument('--latency', type=float, default=0.1, help='Задержка фейкового Stripe, секунды.')
+
+    def handle(self, *args, **options):
+        FakeStripeHandler.latency = options['latency']
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FakeStripeHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        user = User.objects.create(email='bench-async@example.com', is_staff=True)
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+        try:
+            with override_settings(STRIPE_API_BASE=f'http://127.0.0.1:{server.server_port}',
+                                   STRIPE_SECRET_KEY='sk_test_fake', ALLOWED_HOSTS=['localhost'],
+                                   REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}):
+                sync_elapsed = self.run_sync(self.payment_link_urls(user, options), headers, options)
+                async_elapsed = asyncio.run(self.run_async(self.payment_link_urls(user, options), headers, options))
+        finally:
+            server.shutdown()
+            Course.objects.filter(owner=user).delete()
+            user.delete()
+
+        total = options['requests']
+        self.stdout.write(f'запросов: {total}, задержка Stripe: {options["latency"]} с')
+        self.stdout.write(f'WSGI, потоков {options["threads"]}: {total / sync_elapsed:.1f} запр/с')
+        self.stdout.write(f'ASGI, одновременно {options["concurrency"]}: {total / async_elapsed:.1f} запр/с')
+
+    @staticmethod
+    def payment_link_urls(user, options):
+        # Отдельный курс без сохранённой ссылки на каждый запрос: каждый запрос ждёт Stripe
+        courses = Course.objects.bulk_create(
+            Course(title='bench', description='bench', price=100, owner=user) for _ in range(options['requests'])
+        )
+        return [reverse('course:async-course-payment-link', args=[course.pk]) for course in courses]
+
+    def run_sync(self, urls, headers, options):
+        transport = httpx.WSGITransport(app=get_wsgi_application())
+        with httpx.Client(transport=transport, base_url='http://localhost', headers=headers) as client:
+            def fetch(url):
+                response = client.get(url)
+                response.raise_for_status()
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+                list(executor.map(fetch, urls))
+            return time.perf_counter() - started
+
+    async def run_async(self, urls, headers, options):
+        transport = httpx.ASGITransport(app=get_asgi_application())
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async with httpx.AsyncClient(transport=transport, base_url='http://localhost', headers=headers) as client:
+            async def fetch(url):
+                async with semaphore:
+                    response = await client.get(url)
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(fetch(url) for url in urls))
+            return time.perf_counter() - started
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management import BaseCommand
+from django.core.signals import request_started, request_finished
+from django.db import connection
+
+from course.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает цикл запрос-ответ без постоянных соединений с базой и с ними (CONN_MAX_AGE).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--conn-max-age', type=int, default=600)
+
+    def handle(self, *args, **options):
+        for max_age in (0, options['conn_max_age']):
+            opened, elapsed = self.run(max_age, options['requests'])
+            self.stdout.write(
+                f'CONN_MAX_AGE={max_age}: открыто соединений {opened}, '
+                f'{options["requests"] / elapsed:.1f} запр/с, {elapsed / options["requests"] * 1000:.2f} мс/запр'
+            )
+
+    def run(self, max_age, requests):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        opened = 0
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            # Те же сигналы, по которым Django закрывает устаревшие соединения в начале и конце запроса
+            request_started.send(sender=self.__class__)
+            if connection.connection is None:
+                opened += 1
+            Course.objects.exists()
+            request_finished.send(sender=self.__class__)
+        elapsed = time.perf_counter() - started
+
+        connection.close()
+        return opened, elapsed
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from DRF.schema import generate_schema, get_schema_path
+
+
+class Command(BaseCommand):
+    help = 'Генерирует OpenAPI-схему документации в файл, откуда её отдают /docs/ и /redoc/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--api-version', default=settings.API_VERSION)
+
+    def handle(self, *args, **options):
+        if not settings.BUILD_ID:
+            self.stderr.write('BUILD_ID не задан: схема будет строиться в памяти процесса, файл не записан')
+            return
+
+        path = get_schema_path(options['api_version'], settings.BUILD_ID)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(generate_schema(options['api_version']))
+        self.stdout.write(f'Схема записана в {path}')
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_INDEXES = (
+    ('course', 'course_search_vector_gin'),
+    ('lesson', 'lesson_search_vector_gin'),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN-индексы и tsvector есть только в Postgres; на SQLite поиск работает через icontains
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for model_name, index_name in SEARCH_INDEXES:
+        model = apps.get_model('course', model_name)
+        model.objects.using(schema_editor.connection.alias).update(
+            search_vector=SearchVector('title', weight='A', config='russian')
+            + SearchVector('description', weight='B', config='russian')
+        )
+        schema_editor.add_index(model, django.contrib.postgres.indexes.GinIndex(
+            fields=['search_vector'], name=index_name,
+        ))
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for model_name, index_name in SEARCH_INDEXES:
+        model = apps.get_model('course', model_name)
+        schema_editor.remove_index(model, django.contrib.postgres.indexes.GinIndex(
+            fields=['search_vector'], name=index_name,
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0002_course_owner_course_price_lesson_owner_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='course',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'],
+                                                                   name='course_search_vector_gin'),
+                ),
+                migrations.AddIndex(
+                    model_name='lesson',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'],
+                                                                   name='lesson_search_vector_gin'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_indexes, drop_search_indexes),
+            ],
+        ),
+    ]
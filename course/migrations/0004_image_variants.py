@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0003_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='preview_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Превью(размеры)'),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='preview_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Превью(размеры)'),
+        ),
+    ]
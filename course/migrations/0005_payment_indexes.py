@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_method',
+            field=models.CharField(choices=[('cash', 'Наличные'), ('transfer', 'Перевод на счет')], db_index=True, max_length=20),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0005_payment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='payment_link',
+            field=models.URLField(blank=True, default='', editable=False, verbose_name='Ссылка на оплату'),
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=50, verbose_name='Тип события')),
+                ('aggregate', models.CharField(max_length=50, verbose_name='Сущность')),
+                ('aggregate_id', models.BigIntegerField(verbose_name='Идентификатор сущности')),
+                ('payload', models.JSONField(default=dict, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Обработано')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['created_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-19 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0006_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='payment_link_price',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='payment_link_title',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+    ]
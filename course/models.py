@@ -1,55 +1,222 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, router, transaction
+from django.db.models import DEFERRED
 from django.conf import settings
 
 from users.models import User
+from DRF.images import has_new_upload, schedule_image_variants
+from .search import SEARCH_FIELDS, update_search_vector
 
 
 NULLABLE = {'blank': True, 'null': True}
 
 
-class Course(models.Model):
+class OutboxEvent(models.Model):
+    """
+            Событие об изменении курса, урока или подписки.
+
+            Пишется в той же транзакции, что и само изменение, а побочные действия (рассылка, ссылка на оплату)
+            выполняет задача relay_outbox_events, которая разбирает необработанные события пачками.
+    """
+    event_type = models.CharField(max_length=50, verbose_name='Тип события')
+    aggregate = models.CharField(max_length=50, verbose_name='Сущность')
+    aggregate_id = models.BigIntegerField(verbose_name='Идентификатор сущности')
+    payload = models.JSONField(default=dict, verbose_name='Данные')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    processed_at = models.DateTimeField(**NULLABLE, verbose_name='Обработано')
+
+    class Meta:
+        indexes = [
+            # Частичный индекс: обработанные события, которых большинство, в него не попадают
+            models.Index(fields=['created_at'], condition=models.Q(processed_at__isnull=True),
+                         name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} #{self.aggregate_id}'
+
+    @classmethod
+    def build(cls, instance, action):
+        aggregate = instance._meta.model_name
+        return cls(
+            event_type=f'{aggregate}.{action}',
+            aggregate=aggregate,
+            aggregate_id=instance.pk,
+            payload={field: getattr(instance, field) for field in instance.outbox_fields},
+        )
+
+    @classmethod
+    def record(cls, instance, action, using=None):
+        cls.build(instance, action).save(using=using)
+
+
+class OutboxQuerySet(models.QuerySet):
+
+    def delete(self):
+        # Один SELECT удаляемых строк и один INSERT их событий перед удалением
+        db = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            instances = self.using(db).only(*self.model.outbox_fields)
+            OutboxEvent.objects.using(db).bulk_create([OutboxEvent.build(instance, 'deleted') for instance in instances])
+            return super().delete()
+
+
+class OutboxModel(models.Model):
+    """
+            Модель, изменения которой записываются в OutboxEvent в одной транзакции с сохранением или удалением.
+
+            Событие удаления пишется только для удаляемого объекта: удалённые каскадом объекты следуют из него,
+            а без обработчиков сигналов удаления Django удаляет их одним запросом на таблицу.
+
+            Атрибуты:
+                outbox_fields : Поля, которые попадают в данные события.
+    """
+    outbox_fields = ()
+
+    objects = OutboxQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        action = 'created' if self._state.adding else 'updated'
+
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            OutboxEvent.record(self, action, using=using)
+            self.after_save(using, kwargs.get('update_fields'))
+
+    def after_save(self, using, update_fields):
+        """Запросы, которые должны пройти в одной транзакции с сохранением."""
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(self.__class__, instance=self)
+
+        with transaction.atomic(using=using):
+            OutboxEvent.record(self, 'deleted', using=using)
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class SearchableModel(OutboxModel):
+    """
+            Модель с полнотекстовым полем search_vector по полям SEARCH_FIELDS.
+
+            Вектор пересчитывается в транзакции сохранения и только если название или описание изменились
+            с момента загрузки объекта из базы.
+    """
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_search_values = instance.get_search_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        # Отложенное поле, подгруженное из базы (например, для данных события), не считается изменённым
+        loaded = self.get_search_values()
+        saved = getattr(self, '_saved_search_values', {})
+        self._saved_search_values = {field: loaded[field] if fields is None or field in fields else saved.get(field)
+                                     for field in SEARCH_FIELDS}
+
+    def get_search_values(self):
+        # Отложенные поля не загружаем: если их не присвоили, они и не изменились
+        return {field: self.__dict__.get(field, DEFERRED) for field in SEARCH_FIELDS}
+
+    def after_save(self, using, update_fields):
+        super().after_save(using, update_fields)
+        if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+            return
+
+        search_values = self.get_search_values()
+        if getattr(self, '_saved_search_values', None) != search_values:
+            update_search_vector(self.__class__.objects.using(using).filter(pk=self.pk))
+            self._saved_search_values = search_values
+
+
+class Course(SearchableModel):
     title = models.CharField(max_length=20, verbose_name='Название')
     preview = models.ImageField(upload_to='course/', verbose_name='Превью(картинка)', **NULLABLE)
     description = models.TextField(verbose_name='Описание')
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, **NULLABLE)
     price = models.IntegerField(default=0, blank=True, null=True, verbose_name='стоимость')
+    payment_link = models.URLField(blank=True, default='', editable=False, verbose_name='Ссылка на оплату')
+    # Название и цена, для которых создана ссылка: по ним видно, нужна ли новая ссылка
+    payment_link_title = models.CharField(max_length=20, blank=True, default='', editable=False)
+    payment_link_price = models.IntegerField(**NULLABLE, editable=False)
+    preview_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Превью(размеры)')
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    outbox_fields = ('title', 'price', 'owner_id')
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='course_search_vector_gin')]
 
     def __str__(self):
         return f'{self.title}'
 
+    def has_current_payment_link(self):
+        link_for = (self.payment_link_title, self.payment_link_price)
+        return bool(self.payment_link) and link_for == (self.title, self.price)
+
+    def save(self, *args, **kwargs):
+        preview_uploaded = has_new_upload(self.preview)
+        super().save(*args, **kwargs)
+        if preview_uploaded:
+            schedule_image_variants(self, 'preview')
+
 
-class Lesson(models.Model):
+class Lesson(SearchableModel):
     title = models.CharField(max_length=50, verbose_name='Название')
     description = models.TextField(verbose_name='Описание')
     preview = models.ImageField(upload_to='lesson/', verbose_name='Превью(картинка)', null=True)
     url = models.URLField(verbose_name='Ссылка на видео')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, verbose_name="Курс")
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, **NULLABLE)
+    preview_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Превью(размеры)')
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    outbox_fields = ('title', 'course_id', 'owner_id')
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='lesson_search_vector_gin')]
 
     def __str__(self):
         return f'{self.title}'
 
+    def save(self, *args, **kwargs):
+        preview_uploaded = has_new_upload(self.preview)
+        super().save(*args, **kwargs)
+        if preview_uploaded:
+            schedule_image_variants(self, 'preview')
+
 
 class Payment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    date = models.DateField()
+    date = models.DateField(db_index=True)
     course = models.ForeignKey('course.Course', on_delete=models.CASCADE, **NULLABLE,
                                verbose_name="оплаченный курс")
     lesson = models.ForeignKey('course.Lesson', on_delete=models.CASCADE, **NULLABLE,
                                verbose_name="оплаченный урок")
     amount = models.IntegerField(default=0, blank=True, null=True, verbose_name='стоимость')
-    payment_method = models.CharField(max_length=20,
+    payment_method = models.CharField(max_length=20, db_index=True,
                                       choices=[('cash', 'Наличные'), ('transfer', 'Перевод на счет')])
 
     def __str__(self):
         return f"{self.user.username} - {self.date}"
 
 
-class Subscription(models.Model):
+class Subscription(OutboxModel):
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="Юзер")
     course = models.ForeignKey(Course, on_delete=models.CASCADE, verbose_name="Курс")
 
+    outbox_fields = ('user_id', 'course_id')
+
     def __str__(self):
         return f'{self.user.email} - {self.course.title}'
 
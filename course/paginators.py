@@ -1,3 +1,7 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
 
 
@@ -11,3 +15,34 @@ class LessonPaginator(PageNumberPagination):
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 10
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+            Пагинатор для больших таблиц в админке.
+
+            Для выборки без фильтров на Postgres число строк берётся из статистики планировщика (pg_class.reltuples),
+            если оно больше ADMIN_ESTIMATED_COUNT_THRESHOLD: точный COUNT по миллионам строк выполняется на каждой
+            странице списка. Для отфильтрованных выборок, небольших таблиц и других баз считается точное число.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        if estimate is not None and estimate > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+    def estimated_count(self):
+        queryset = self.object_list
+        if queryset.query.where or queryset.query.distinct:
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        return int(row[0]) if row else None
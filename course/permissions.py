@@ -16,6 +16,6 @@ class IsModerator(BasePermission):
     message = "Вы не модератор."
 
     def has_permission(self, request, view):
-        if request.user.role == UserRoles.MODERATOR:
+        if getattr(request.user, 'role', None) == UserRoles.MODERATOR:
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,38 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, Q
+
+# Конфигурация полнотекстового поиска Postgres, соответствует LANGUAGE_CODE = 'ru-ru'
+SEARCH_CONFIG = 'russian'
+SEARCH_FIELDS = ('title', 'description')
+
+
+def is_full_text_supported(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def build_search_vector():
+    return (SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG))
+
+
+def update_search_vector(queryset):
+    """Пересчитывает поисковый вектор одним UPDATE для всех объектов выборки."""
+    if is_full_text_supported(queryset):
+        queryset.update(search_vector=build_search_vector())
+
+
+def search_queryset(queryset, term):
+    """
+            Ищет term по названию и описанию.
+
+            В Postgres используется индексированный search_vector, результаты упорядочены по релевантности.
+            На других базах (SQLite в тестах) выполняется регистронезависимый поиск подстроки.
+    """
+    if is_full_text_supported(queryset):
+        query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).filter(search_vector=query).order_by('-search_rank')
+
+    return queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
@@ -1,7 +1,10 @@
+from django.db import transaction
 from rest_framework import serializers
 
-from .models import Course, Lesson, Payment, Subscription
-from .services import stripe_get_link
+from DRF.images import ImageVariantsField, StreamingImageField
+from .models import Course, Lesson, OutboxEvent, Payment, Subscription
+from .search import update_search_vector
+from .validators import validator_scam_url
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -10,10 +13,18 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseBaseSerializer(serializers.ModelSerializer):
+    preview = StreamingImageField(required=False, allow_null=True)
+    preview_variants = ImageVariantsField('preview')
+
+    class Meta:
+        model = Course
+        exclude = ['search_vector', 'payment_link_title', 'payment_link_price']
+
+
+class CourseSerializer(CourseBaseSerializer):
     lesson_count = serializers.SerializerMethodField()
     is_subscribed = serializers.SerializerMethodField()
-    payment_link = serializers.SerializerMethodField()
 
     def get_lesson_count(self, obj):
         return Lesson.objects.filter(course=obj).count()
@@ -23,21 +34,83 @@ class CourseSerializer(serializers.ModelSerializer):
 
         return Subscription.objects.filter(user=user, course=obj).exists()
 
-    def get_payment_link(self, obj):
-        return stripe_get_link(obj)
+
+class LessonSerializer(serializers.ModelSerializer):
+    preview = StreamingImageField(required=False, allow_null=True)
+    preview_variants = ImageVariantsField('preview')
 
     class Meta:
-        model = Course
-        fields = '__all__'
+        model = Lesson
+        exclude = ['search_vector']
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class BulkCourseField(serializers.Field):
+    """Курс урока, найденный среди курсов, заранее загруженных списочным сериализатором одним запросом."""
+    default_error_messages = {
+        'does_not_exist': 'Курс с id {pk_value} не найден.',
+    }
+
+    def to_internal_value(self, data):
+        course = self.context['courses'].get(LessonBulkListSerializer.parse_pk(data))
+        if course is None:
+            self.fail('does_not_exist', pk_value=data)
+        return course
+
+    def to_representation(self, value):
+        return value.pk
+
+
+class LessonBulkListSerializer(serializers.ListSerializer):
+    """
+    Проверяет все строки за один проход и создаёт уроки одним INSERT в транзакции.
+
+    Ошибки возвращаются списком по строкам, в том же порядке, что и входные данные.
+    """
+
+    @staticmethod
+    def parse_pk(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            course_ids = {self.parse_pk(item.get('course')) for item in data if isinstance(item, dict)}
+            self.context['courses'] = Course.objects.in_bulk(course_ids - {None})
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            lessons = Lesson.objects.bulk_create([Lesson(**item) for item in validated_data])
+            update_search_vector(Lesson.objects.filter(pk__in=[lesson.pk for lesson in lessons]))
+            OutboxEvent.objects.bulk_create([OutboxEvent.build(lesson, 'created') for lesson in lessons])
+        return lessons
+
+
+class LessonBulkSerializer(serializers.ModelSerializer):
+    url = serializers.URLField(validators=[validator_scam_url])
+    course = BulkCourseField()
+
     class Meta:
         model = Lesson
-        fields = '__all__'
+        fields = ['id', 'title', 'description', 'url', 'course']
+        list_serializer_class = LessonBulkListSerializer
 
 
 class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = '__all__'
+
+
+class CourseSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'description']
+
+
+class LessonSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Lesson
+        fields = ['id', 'title', 'description', 'course']
@@ -1,3 +1,4 @@
+import httpx
 import stripe
 from django.conf import settings
 
@@ -5,6 +6,7 @@ from django.conf import settings
 def stripe_get_link(obj):
 
     stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_base = settings.STRIPE_API_BASE
     created_product = stripe.Product.create(name=obj.title)
 
     created_price = stripe.Price.create(
@@ -21,4 +23,32 @@ def stripe_get_link(obj):
             },
         ],
     )
-    return response.url
\ No newline at end of file
+    return response.url
+
+
+async def astripe_get_link(obj):
+    """Асинхронный вариант stripe_get_link: не занимает поток на время ожидания ответов Stripe."""
+    async with httpx.AsyncClient(
+        base_url=settings.STRIPE_API_BASE,
+        headers={'Authorization': f'Bearer {settings.STRIPE_SECRET_KEY}'},
+        timeout=settings.STRIPE_TIMEOUT,
+    ) as client:
+        created_product = await _astripe_post(client, '/v1/products', {'name': obj.title})
+
+        created_price = await _astripe_post(client, '/v1/prices', {
+            'unit_amount': obj.price * 100,
+            'currency': 'eur',
+            'product': created_product['id'],
+        })
+
+        response = await _astripe_post(client, '/v1/payment_links', {
+            'line_items[0][price]': created_price['id'],
+            'line_items[0][quantity]': 1,
+        })
+    return response['url']
+
+
+async def _astripe_post(client, path, data):
+    response = await client.post(path, data=data)
+    response.raise_for_status()
+    return response.json()
@@ -1,32 +1,128 @@
 from datetime import timedelta
 
+from django.apps import apps
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from celery import shared_task
 from django.core.mail import EmailMessage
 
-from .models import User, Course
+from DRF.idempotency import IdempotentTask, make_idempotency_key
+from DRF.images import generate_variants
+from .models import User, Course, OutboxEvent
+from .services import stripe_get_link
 
 
-@shared_task
-def course_update_mail(course_id: int, obj=None) -> None:
+@shared_task(base=IdempotentTask, ignore_result=True)
+def course_update_mail(course_id: int) -> None:
     course = Course.objects.get(pk=course_id)
 
-    recipient_list = [
-        subscription.user
-        for subscription in course.subscription_set.all()
-    ]
+    recipient_list = list(course.subscription_set.values_list('user__email', flat=True))
 
     if recipient_list:
-        subject = f'Обновление курса {obj.title}'
+        subject = f'Обновление курса {course.title}'
         message = 'Произошло обновление курса'
         from_email = settings.EMAIL_HOST_USER
-        email = EmailMessage(subject, message, from_email, recipient_list)
+        # Подписчики в скрытой копии: получатели не должны видеть адреса друг друга
+        email = EmailMessage(subject, message, from_email, bcc=recipient_list)
         email.send()
 
-@shared_task
+
+@shared_task(ignore_result=True)
+def purge_outbox_events():
+    """Удаляет обработанные события outbox старше OUTBOX_RETENTION_DAYS дней."""
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    OutboxEvent.objects.filter(processed_at__lt=cutoff).delete()
+
+
+@shared_task(ignore_result=True)
 def check_inactive_users():
     one_month_ago = timezone.now() - timedelta(days=30)
     User.objects.filter(
         last_login__lte=one_month_ago, is_active=True
-    ).update(is_active=False)
\ No newline at end of file
+    ).update(is_active=False)
+
+
+@shared_task(base=IdempotentTask, ignore_result=True)
+def generate_image_variants(model_label: str, pk: int, field_name: str) -> None:
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+
+    variants = generate_variants(field_file)
+
+    # Если за время обработки загрузили другой файл, его превью сгенерирует своя задача
+    model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**{f'{field_name}_variants': variants})
+
+
+@shared_task(base=IdempotentTask, ignore_result=True)
+def stripe_create_payment_link(course_id: int) -> None:
+    course = Course.objects.filter(pk=course_id).first()
+    if course is None or not course.price or course.has_current_payment_link():
+        return
+
+    # update, а не save: сохранение курса записало бы в outbox новое событие
+    Course.objects.filter(pk=course_id).update(
+        payment_link=stripe_get_link(course), payment_link_title=course.title, payment_link_price=course.price
+    )
+
+
+def dispatch_course_event(event):
+    if event.event_type == 'course.updated':
+        # Ключ — id события: повторная доставка того же события не приведёт к повторной рассылке
+        course_update_mail.delay_idempotent(make_idempotency_key('outbox', event.pk), event.aggregate_id)
+
+    # Задача сама пропускает курс, если ссылка создана для тех же названия и цены;
+    # ключ не даёт двум воркерам одновременно создать ссылку для одних и тех же данных
+    payment_link_key = make_idempotency_key(
+        'payment_link', event.aggregate_id, event.payload['title'], event.payload['price']
+    )
+    stripe_create_payment_link.delay_idempotent(payment_link_key, event.aggregate_id)
+
+
+# Обработчики событий outbox; события без обработчика только отмечаются обработанными
+OUTBOX_HANDLERS = {
+    'course.created': dispatch_course_event,
+    'course.updated': dispatch_course_event,
+}
+
+
+@shared_task(ignore_result=True)
+def relay_outbox_events(batch_size: int = None) -> int:
+    """
+            Разбирает необработанные события outbox пачками и ставит в очередь задачи-обработчики.
+
+            Строки пачки блокируются через select_for_update(skip_locked=True), поэтому несколько воркеров
+            разбирают outbox параллельно, не получая одних и тех же событий. Пачка отмечается обработанной
+            после постановки задач в той же транзакции: если воркер упал или транзакция откатилась, события
+            будут разобраны заново (доставка «хотя бы раз»), а повторно поставленные задачи обработчики
+            пропустят по ключу идемпотентности.
+
+            Returns:
+                int: Число обработанных событий.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    processed = 0
+
+    while True:
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(processed_at__isnull=True)
+                .order_by('created_at', 'pk')[:batch_size]
+            )
+            for event in events:
+                handler = OUTBOX_HANDLERS.get(event.event_type)
+                if handler is not None:
+                    handler(event)
+            if events:
+                OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(processed_at=timezone.now())
+
+        processed += len(events)
+        if len(events) < batch_size:
+            return processed
@@ -1,8 +1,35 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+from PIL import Image
+
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from .models import Course, Lesson, Subscription
+from DRF.db_router import read_from_replica
+from celery.exceptions import Retry
+from django.conf import settings
+from DRF.idempotency import (IDEMPOTENCY_KEY_PREFIX, CacheIdempotencyStore, RedisIdempotencyStore,
+                             get_idempotency_store, make_idempotency_key)
+from DRF.schema import clear_schema_cache
+from .models import Course, Lesson, OutboxEvent, Payment, Subscription
+from .paginators import EstimatedCountPaginator
+from .tasks import (course_update_mail, generate_image_variants, purge_outbox_events, relay_outbox_events,
+                    stripe_create_payment_link)
 
 User = get_user_model()
 
@@ -81,3 +108,538 @@ class SubscriptionTests(APITestCase):
         self.assertFalse(Subscription.objects.filter(user=self.user, course=self.course).exists())
 
 
+class AsyncCourseViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='test@mail.ru', password='test1234', is_staff=True, is_superuser=True)
+        self.client.force_login(self.user)
+        self.course = Course.objects.create(
+            title='Test Course',
+            description='Test Course Description',
+            owner=self.user,
+            price=100
+        )
+
+    def test_retrieve_course(self):
+        Course.objects.filter(pk=self.course.pk).update(payment_link='https://buy.stripe.com/test')
+        url = reverse('course:async-course-detail', args=[self.course.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['payment_link'], 'https://buy.stripe.com/test')
+        self.assertEqual(response.json()['lesson_count'], 0)
+
+    def test_retrieve_requires_authentication(self):
+        self.client.logout()
+        url = reverse('course:async-course-detail', args=[self.course.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_subscribe_to_course(self):
+        url = reverse('course:async-subscribe-course', args=[self.course.id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Subscription.objects.filter(user=self.user, course=self.course).exists())
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_payment_link_requires_price(self):
+        Course.objects.filter(pk=self.course.pk).update(price=None)
+        url = reverse('course:async-course-payment-link', args=[self.course.id])
+        with patch('course.async_views.astripe_get_link') as astripe_get_link:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        astripe_get_link.assert_not_called()
+
+    @patch('course.async_views.astripe_get_link', side_effect=httpx.ConnectError('Stripe недоступен'))
+    def test_payment_link_stripe_failure(self, astripe_get_link):
+        url = reverse('course:async-course-payment-link', args=[self.course.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.payment_link, '')
+
+
+class CeleryRoutingTests(SimpleTestCase):
+    def route(self, task_name):
+        from DRF.celery import app
+        return app.amqp.router.route({}, task_name)['queue'].name
+
+    def test_tasks_are_routed_to_their_queues(self):
+        self.assertEqual(self.route('course.tasks.course_update_mail'), 'notifications')
+        self.assertEqual(self.route('course.tasks.check_inactive_users'), 'maintenance')
+        self.assertEqual(self.route('course.tasks.relay_outbox_events'), 'maintenance')
+        self.assertEqual(self.route('course.tasks.purge_outbox_events'), 'maintenance')
+        self.assertEqual(self.route('course.tasks.stripe_create_payment_link'), 'billing')
+
+    def test_unrouted_task_goes_to_default_queue(self):
+        self.assertEqual(self.route('course.tasks.unknown'), 'default')
+
+
+class CourseUpdateMailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='test@mail.ru', password='test1234')
+        self.course = Course.objects.create(title='Test Course', description='Test Course Description')
+        Subscription.objects.create(user=self.user, course=self.course)
+
+    def test_duplicate_enqueue_sends_mail_once(self):
+        course_update_mail.apply(args=[self.course.id], headers={'idempotency_key': 'update-1'})
+        course_update_mail.apply(args=[self.course.id], headers={'idempotency_key': 'update-1'})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [])
+        self.assertEqual(mail.outbox[0].bcc, ['test@mail.ru'])
+
+    def test_different_keys_send_mail_again(self):
+        course_update_mail.apply(args=[self.course.id], headers={'idempotency_key': 'update-1'})
+        course_update_mail.apply(args=[self.course.id], headers={'idempotency_key': 'update-2'})
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_delay_idempotent_passes_key_through_broker_message(self):
+        # Настоящая постановка через apply_async: Celery сверяет аргументы с сигнатурой задачи
+        course_update_mail.delay_idempotent('update-1', self.course.id)
+        course_update_mail.delay_idempotent('update-1', self.course.id)
+        course_update_mail.delay(self.course.id)
+
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_key_done_while_waiting_for_lock_is_skipped(self):
+        store = MagicMock()
+        # Первая проверка до захвата блокировки, вторая — после: другой воркер успел выполнить задачу
+        store.is_done.side_effect = [False, True]
+        store.acquire.return_value = True
+
+        with patch('DRF.idempotency.get_idempotency_store', return_value=store):
+            course_update_mail.apply(args=[self.course.id], headers={'idempotency_key': 'update-1'})
+
+        self.assertEqual(len(mail.outbox), 0)
+        store.release.assert_called_once()
+        store.mark_done.assert_not_called()
+
+    def test_held_lock_retries_instead_of_dropping(self):
+        lock_key = f'{IDEMPOTENCY_KEY_PREFIX}:{course_update_mail.name}:update-1:lock'
+        CacheIdempotencyStore().acquire(lock_key, 'other-worker', 60)
+
+        with patch.object(course_update_mail, 'retry', side_effect=Retry) as retry, self.assertRaises(Retry):
+            course_update_mail.apply(args=[self.course.id], headers={'idempotency_key': 'update-1'})
+
+        retry.assert_called_once_with(countdown=settings.IDEMPOTENCY_LOCK_TTL,
+                                      max_retries=course_update_mail.idempotency_max_retries)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class RedisIdempotencyStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.register_script.side_effect = lambda script: MagicMock()
+        self.store = RedisIdempotencyStore(self.client)
+
+    def test_acquire_sets_key_only_if_absent_with_ttl(self):
+        self.client.set.return_value = True
+        self.assertTrue(self.store.acquire('lock', 'token', 60))
+        self.client.set.assert_called_once_with('lock', 'token', nx=True, px=60000)
+
+    def test_release_and_extend_check_lock_owner(self):
+        self.store.release('lock', 'token')
+        self.store.extend('lock', 'token', 60)
+
+        self.store.release_script.assert_called_once_with(keys=['lock'], args=['token'])
+        self.store.extend_script.assert_called_once_with(keys=['lock'], args=['token', 60000])
+
+    @override_settings(IDEMPOTENCY_REDIS_URL='redis://redis:6379')
+    def test_store_uses_redis_when_configured(self):
+        with patch('DRF.idempotency._store', None), \
+                patch('DRF.idempotency.redis.Redis.from_url', return_value=self.client) as from_url:
+            self.assertIsInstance(get_idempotency_store(), RedisIdempotencyStore)
+        from_url.assert_called_once_with('redis://redis:6379', decode_responses=True)
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='test@mail.ru', password='test1234')
+        self.client.force_authenticate(user=self.user)
+        self.course = Course.objects.create(title='Python', description='Основы программирования')
+        Lesson.objects.create(title='Списки', description='Работа со списками в Python', course=self.course)
+        Lesson.objects.create(title='Словари', description='Хеш-таблицы', course=self.course)
+
+    def test_search_lessons_list(self):
+        response = self.client.get(reverse('course:lesson-list'), {'search': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([lesson['title'] for lesson in response.data['results']], ['Списки'])
+        self.assertNotIn('search_vector', response.data['results'][0])
+
+    def test_search_endpoint(self):
+        response = self.client.get(reverse('course:search'), {'search': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([course['id'] for course in response.data['courses']], [self.course.id])
+        self.assertEqual(len(response.data['lessons']), 1)
+
+    def test_search_endpoint_requires_query(self):
+        response = self.client.get(reverse('course:search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_vector_updated_only_for_changed_text(self):
+        course = Course.objects.get(pk=self.course.pk)
+        outer_savepoints = len(connection.savepoint_ids)
+        savepoints = []
+        with patch('course.models.update_search_vector',
+                   side_effect=lambda queryset: savepoints.append(len(connection.savepoint_ids))) as update:
+            course.price = 200
+            course.save()
+            update.assert_not_called()
+
+            course.description = 'Основы Python'
+            course.save()
+            course.save()
+            self.assertEqual(update.call_count, 1)
+
+            Course.objects.only('price').get(pk=course.pk).save()
+            self.assertEqual(update.call_count, 1)
+
+        # Вектор пересчитывается в той же транзакции, что и сохранение
+        self.assertEqual(savepoints, [outer_savepoints + 1])
+
+
+def make_image(width, height, name='preview.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageVariantsTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(email='test@mail.ru', password='test1234', is_staff=True)
+        self.client.force_authenticate(user=self.user)
+        self.course = Course.objects.create(title='Test Course', description='Test Course Description')
+
+    def test_upload_schedules_variants(self):
+        with patch.object(generate_image_variants, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                lesson = Lesson.objects.create(title='Lesson', description='Lesson', course=self.course,
+                                               preview=make_image(1200, 800))
+        self.assertEqual(apply_async.call_args.args[0], ('course.Lesson', lesson.pk, 'preview'))
+
+    def test_generate_variants(self):
+        lesson = Lesson.objects.create(title='Lesson', description='Lesson', course=self.course)
+        Lesson.objects.filter(pk=lesson.pk).update(preview=lesson.preview.storage.save('lesson/big.png',
+                                                                                      make_image(1200, 800)))
+
+        generate_image_variants.apply(args=['course.Lesson', lesson.pk, 'preview'])
+
+        lesson.refresh_from_db()
+        with lesson.preview.storage.open(lesson.preview_variants['thumb']) as file:
+            self.assertEqual(Image.open(file).size, (160, 107))
+        response = self.client.get(reverse('course:lesson-detail', args=[lesson.id]))
+        self.assertTrue(response.data['preview_variants']['medium'].endswith('big_medium.jpg'))
+
+    @override_settings(IMAGE_MAX_DIMENSIONS=(100, 100))
+    def test_oversized_image_is_rejected(self):
+        data = {
+            'title': 'New Lesson',
+            'description': 'New Lesson Description',
+            'url': 'https://www.youtube.com/testlesson',
+            'course': self.course.id,
+            'preview': make_image(200, 50),
+        }
+        response = self.client.post(reverse('course:lesson-create'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('preview', response.data)
+
+    def test_decompression_bomb_is_rejected(self):
+        data = {
+            'title': 'New Lesson',
+            'description': 'New Lesson Description',
+            'url': 'https://www.youtube.com/testlesson',
+            'course': self.course.id,
+            'preview': make_image(200, 50),
+        }
+        with patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            response = self.client.post(reverse('course:lesson-create'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('preview', response.data)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReadReplicaTests(APITestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create(email='test@mail.ru', password='test1234')
+        self.client.force_authenticate(user=self.user)
+        self.course = Course.objects.create(title='Primary', description='Primary')
+        Lesson.objects.create(title='Primary lesson', description='Primary', course=self.course)
+
+        replica_course = Course.objects.using('replica').create(title='Replica', description='Replica')
+        Lesson.objects.using('replica').create(title='Replica lesson', description='Replica', course=replica_course)
+
+    def test_list_reads_from_replica(self):
+        response = self.client.get(reverse('course:lesson-list'))
+        self.assertEqual([lesson['title'] for lesson in response.data['results']], ['Replica lesson'])
+
+    def test_detail_reads_from_primary(self):
+        lesson = Lesson.objects.get(title='Primary lesson')
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('course:lesson-detail', args=[lesson.id]))
+        self.assertEqual(response.data['title'], 'Primary lesson')
+
+    def test_read_after_write_sticks_to_primary(self):
+        with read_from_replica():
+            self.assertEqual(Course.objects.get().title, 'Replica')
+            Course.objects.create(title='New', description='New')
+            self.assertEqual(Course.objects.count(), 2)
+
+
+class LessonBulkCreateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='test@mail.ru', password='test1234', is_staff=True)
+        self.client.force_authenticate(user=self.user)
+        self.courses = [Course.objects.create(title=f'Course {i}', description='Description') for i in range(2)]
+        self.url = reverse('course:lesson-bulk-create')
+
+    def lesson_data(self, index, course, url='https://www.youtube.com/lesson'):
+        return {'title': f'Lesson {index}', 'description': 'Description', 'url': url, 'course': course}
+
+    def test_bulk_create_lessons(self):
+        data = [self.lesson_data(i, self.courses[i % 2].id) for i in range(20)]
+
+        # Один запрос на курсы и по одному INSERT уроков и событий outbox, независимо от числа строк
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(Lesson.objects.filter(owner=self.user).count(), 20)
+
+    def test_bulk_create_returns_row_errors(self):
+        data = [
+            self.lesson_data(0, self.courses[0].id),
+            self.lesson_data(1, self.courses[0].id, url='https://example.com/lesson'),
+            self.lesson_data(2, 999),
+        ]
+        response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('url', response.data[1])
+        self.assertIn('course', response.data[2])
+        self.assertFalse(Lesson.objects.exists())
+
+
+class SchemaCacheTests(APITestCase):
+    def setUp(self):
+        self.schema_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.schema_dir)
+        self.addCleanup(clear_schema_cache)
+        clear_schema_cache()
+        self.url = reverse('schema-swagger-ui') + '?format=openapi'
+
+    def test_schema_generated_once_and_served_with_etag(self):
+        with override_settings(OPENAPI_SCHEMA_DIR=Path(self.schema_dir)), \
+                patch('DRF.schema.generate_schema', return_value=b'{"swagger": "2.0"}') as generate_schema:
+            response = self.client.get(self.url)
+            etag = response['ETag']
+            cached_response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'{"swagger": "2.0"}')
+        self.assertEqual(cached_response.status_code, status.HTTP_304_NOT_MODIFIED)
+        generate_schema.assert_called_once()
+
+    def test_schema_read_from_generated_file(self):
+        with override_settings(OPENAPI_SCHEMA_DIR=Path(self.schema_dir), API_VERSION='v2', BUILD_ID='abc123'):
+            call_command('generate_openapi_schema', stdout=StringIO())
+            with patch('DRF.schema.generate_schema') as generate_schema:
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('paths', response.json())
+        self.assertTrue(response['ETag'].startswith('"abc123-'))
+        generate_schema.assert_not_called()
+
+    def test_schema_file_of_other_build_is_ignored(self):
+        with override_settings(OPENAPI_SCHEMA_DIR=Path(self.schema_dir), BUILD_ID='old'):
+            call_command('generate_openapi_schema', stdout=StringIO())
+
+        with override_settings(OPENAPI_SCHEMA_DIR=Path(self.schema_dir), BUILD_ID='new'), \
+                patch('DRF.schema.generate_schema', return_value=b'{"swagger": "2.0"}') as generate_schema:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.content, b'{"swagger": "2.0"}')
+        generate_schema.assert_called_once()
+
+    def test_schema_file_not_used_without_build_id(self):
+        with override_settings(OPENAPI_SCHEMA_DIR=Path(self.schema_dir), BUILD_ID=''):
+            call_command('generate_openapi_schema', stdout=StringIO(), stderr=StringIO())
+            with patch('DRF.schema.generate_schema', return_value=b'{"swagger": "2.0"}') as generate_schema:
+                self.client.get(self.url)
+
+        self.assertFalse(any(Path(self.schema_dir).iterdir()))
+        generate_schema.assert_called_once()
+
+
+class PaymentAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(email='admin@mail.ru', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:course_payment_changelist')
+
+    def create_payments(self, count):
+        course = Course.objects.create(title='Course', description='Description')
+        offset = Payment.objects.count()
+        Payment.objects.bulk_create(
+            Payment(user=User.objects.create(email=f'user{offset + i}@mail.ru'), course=course, date='2023-11-01',
+                    amount=100, payment_method='cash')
+            for i in range(count)
+        )
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.create_payments(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+
+        self.create_payments(10)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(few), len(many))
+
+    def test_estimated_count_falls_back_to_exact_count(self):
+        self.create_payments(3)
+        paginator = EstimatedCountPaginator(Payment.objects.order_by('pk'), 2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
+
+
+class OutboxTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='test@mail.ru', password='test1234', is_staff=True)
+        self.client.force_authenticate(user=self.user)
+        self.course = Course.objects.create(title='Course', description='Description', price=100, owner=self.user)
+
+    def event_types(self):
+        return list(OutboxEvent.objects.order_by('pk').values_list('event_type', flat=True))
+
+    def test_changes_write_events(self):
+        self.client.patch(reverse('course:course-detail', args=[self.course.id]), {'title': 'New title'})
+        Subscription.objects.create(user=self.user, course=self.course)
+        self.course.delete()
+
+        self.assertEqual(self.event_types(), [
+            'course.created', 'course.updated', 'subscription.created', 'course.deleted',
+        ])
+        self.assertEqual(OutboxEvent.objects.get(event_type='course.updated').payload,
+                         {'title': 'New title', 'price': 100, 'owner_id': self.user.id})
+
+    def test_delete_records_root_event_with_constant_queries(self):
+        def delete_course_with_lessons(count):
+            course = Course.objects.create(title='Deleted', description='Description')
+            Lesson.objects.bulk_create(
+                Lesson(title=f'Lesson {i}', description='Description', course=course) for i in range(count)
+            )
+            with CaptureQueriesContext(connection) as queries:
+                course.delete()
+            return len(queries)
+
+        self.assertEqual(delete_course_with_lessons(2), delete_course_with_lessons(20))
+        self.assertEqual(OutboxEvent.objects.filter(event_type='lesson.deleted').count(), 0)
+        self.assertEqual(OutboxEvent.objects.filter(event_type='course.deleted').count(), 2)
+
+    def test_queryset_delete_records_events(self):
+        Lesson.objects.create(title='Lesson', description='Description', course=self.course)
+        Lesson.objects.create(title='Lesson', description='Description', course=self.course)
+
+        Lesson.objects.filter(course=self.course).delete()
+
+        self.assertEqual(OutboxEvent.objects.filter(event_type='lesson.deleted').count(), 2)
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_purge_removes_only_old_processed_events(self):
+        old_event, recent_event = OutboxEvent.objects.bulk_create([
+            OutboxEvent(event_type='course.updated', aggregate='course', aggregate_id=self.course.id,
+                        processed_at=timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS + 1)),
+            OutboxEvent(event_type='course.updated', aggregate='course', aggregate_id=self.course.id,
+                        processed_at=timezone.now()),
+        ])
+
+        purge_outbox_events.apply()
+
+        self.assertFalse(OutboxEvent.objects.filter(pk=old_event.pk).exists())
+        self.assertTrue(OutboxEvent.objects.filter(pk=recent_event.pk).exists())
+        # Необработанное событие создания курса не удаляется
+        self.assertTrue(OutboxEvent.objects.filter(event_type='course.created').exists())
+
+    def test_failed_write_does_not_leave_event(self):
+        with patch.object(OutboxEvent, 'save', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                Course.objects.create(title='Lost', description='Description')
+
+        self.assertFalse(Course.objects.filter(title='Lost').exists())
+
+    @patch('course.tasks.stripe_get_link', return_value='https://buy.stripe.com/test')
+    def test_relay_dispatches_events_once(self, stripe_get_link):
+        # Задачи выполняются сразу (CELERY_TASK_ALWAYS_EAGER), но проходят настоящую постановку через apply_async
+        Subscription.objects.create(user=self.user, course=self.course)
+        self.course.title = 'New title'
+        self.course.save()
+        Lesson.objects.create(title='Lesson', description='Description', course=self.course)
+
+        self.assertEqual(relay_outbox_events.apply(kwargs={'batch_size': 2}).result, 4)
+        self.assertEqual(relay_outbox_events.apply().result, 0)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].bcc, ['test@mail.ru'])
+        # Ссылка создана по первому событию для текущих названия и цены, второе событие её не пересоздаёт
+        stripe_get_link.assert_called_once()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.payment_link, 'https://buy.stripe.com/test')
+        self.assertFalse(OutboxEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_relay_passes_event_key_to_handlers(self):
+        self.course.save()
+        update_event = OutboxEvent.objects.get(event_type='course.updated')
+
+        with patch.object(course_update_mail, 'apply_async') as apply_async, \
+                patch.object(stripe_create_payment_link, 'apply_async'):
+            relay_outbox_events.apply()
+
+        self.assertEqual(apply_async.call_args.kwargs['headers'],
+                         {'idempotency_key': make_idempotency_key('outbox', update_event.pk)})
+
+    def test_failed_publish_leaves_events_pending(self):
+        with patch.object(stripe_create_payment_link, 'apply_async', side_effect=ConnectionError), \
+                self.assertRaises(ConnectionError):
+            relay_outbox_events.apply()
+
+        self.assertTrue(OutboxEvent.objects.filter(event_type='course.created', processed_at__isnull=True).exists())
+
+    @patch('course.tasks.stripe_get_link', return_value='https://buy.stripe.com/test')
+    def test_payment_link_is_stored(self, stripe_get_link):
+        stripe_create_payment_link.apply(args=[self.course.id])
+
+        response = self.client.get(reverse('course:course-detail', args=[self.course.id]))
+        self.assertEqual(response.data['payment_link'], 'https://buy.stripe.com/test')
+        self.assertEqual(self.event_types(), ['course.created'])
+
+    @patch('course.tasks.stripe_get_link', return_value='https://buy.stripe.com/test')
+    def test_payment_link_created_only_for_new_title_or_price(self, stripe_get_link):
+        stripe_create_payment_link.apply(args=[self.course.id])
+        self.course.refresh_from_db()
+
+        self.course.description = 'New description'
+        self.course.save()
+        stripe_create_payment_link.apply(args=[self.course.id])
+        self.assertEqual(stripe_get_link.call_count, 1)
+
+        self.course.price = 200
+        self.course.save()
+        stripe_create_payment_link.apply(args=[self.course.id])
+        self.assertEqual(stripe_get_link.call_count, 2)
@@ -1,7 +1,9 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path
+from course.async_views import CourseRetrieveAsyncView, CoursePaymentLinkAsyncView, SubscribeCourseAsyncView
 from course.views import LessonListAPIView, LessonCreateAPIView, LessonDestroyAPIView, LessonUpdateAPIView, \
-    LessonRetrieveAPIView, CourseViewSet, SubscribeCourseView, UnsubscribeCourseView, PaymentListAPIView
+    LessonRetrieveAPIView, CourseViewSet, SubscribeCourseView, UnsubscribeCourseView, PaymentListAPIView, SearchAPIView, \
+    LessonBulkCreateAPIView
 
 app_name = 'course'
 
@@ -12,10 +14,15 @@ router.register(r'course', CourseViewSet)
 urlpatterns = [
     path('lesson/', LessonListAPIView.as_view(), name='lesson-list'),
     path('lesson/create', LessonCreateAPIView.as_view(), name='lesson-create'),
+    path('lesson/bulk-create', LessonBulkCreateAPIView.as_view(), name='lesson-bulk-create'),
     path('lesson/delete/<int:pk>', LessonDestroyAPIView.as_view(), name='lesson-delete'),
     path('lesson/update/<int:pk>', LessonUpdateAPIView.as_view(), name='lesson-update'),
     path('lesson/<int:pk>', LessonRetrieveAPIView.as_view(), name='lesson-detail'),
     path('payment/', PaymentListAPIView.as_view(), name="payment_list"),
+    path('search/', SearchAPIView.as_view(), name='search'),
     path('subscribe/<int:course_id>/', SubscribeCourseView.as_view(), name='subscribe-course'),
     path('unsubscribe/<int:course_id>/', UnsubscribeCourseView.as_view(), name='unsubscribe-course'),
+    path('async/course/<int:pk>/', CourseRetrieveAsyncView.as_view(), name='async-course-detail'),
+    path('async/course/<int:pk>/payment-link/', CoursePaymentLinkAsyncView.as_view(), name='async-course-payment-link'),
+    path('async/subscribe/<int:course_id>/', SubscribeCourseAsyncView.as_view(), name='async-subscribe-course'),
  ] + router.urls
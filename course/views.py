@@ -1,15 +1,18 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, generics, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .filters import PaymentFilter
+from .filters import PaymentFilter, FullTextSearchFilter
 from .models import Course, Lesson, Payment, Subscription
 from .paginators import CoursePaginator, LessonPaginator
-from .serializers import CourseSerializer, LessonSerializer, PaymentSerializer, SubscriptionSerializer
+from .search import search_queryset
+from .serializers import CourseSerializer, LessonSerializer, PaymentSerializer, SubscriptionSerializer, \
+    CourseSearchSerializer, LessonSearchSerializer, LessonBulkSerializer
 from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView, RetrieveAPIView, DestroyAPIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from course.permissions import IsOwner, IsModerator
-from .tasks import course_update_mail
+from DRF.db_router import read_from_replica
 
 
 class LessonListAPIView(ListAPIView):
@@ -20,11 +23,17 @@ class LessonListAPIView(ListAPIView):
                 serializer_class : Сериализатор для преобразования объектов урока в формат JSON.
                 queryset : Набор объектов уроков, используемых для построения списка.
                 pagination_class : Пагинатор, для отображения уроков на странице.
+                filter_backends : Полнотекстовый поиск по параметру ?search=.
     """
     serializer_class = LessonSerializer
     queryset = Lesson.objects.all()
     permission_classes = [IsAuthenticated]
     pagination_class = LessonPaginator
+    filter_backends = [FullTextSearchFilter]
+
+    @read_from_replica()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
 class LessonCreateAPIView(CreateAPIView):
@@ -38,6 +47,29 @@ class LessonCreateAPIView(CreateAPIView):
     permission_classes = [IsAdminUser]
 
 
+class LessonBulkCreateAPIView(CreateAPIView):
+    """
+            Представление для массового создания уроков (импорт программы курса).
+
+            Принимает список уроков, проверяет все строки и создаёт их одной транзакцией.
+            При ошибках возвращает список ошибок по строкам и ничего не создаёт.
+
+            Атрибуты:
+                serializer_class : Сериализатор урока, используемый для списка.
+                max_lessons : Максимальное число уроков в одном запросе.
+    """
+    serializer_class = LessonBulkSerializer
+    permission_classes = [IsAdminUser]
+    max_lessons = 1000
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, allow_empty=False, max_length=self.max_lessons)
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+
 class LessonDestroyAPIView(DestroyAPIView):
     """
             Представление для удаления урока.
@@ -83,14 +115,18 @@ class CourseViewSet(viewsets.ModelViewSet):
                 queryset : Набор курсов, включая связанные уроки.
                 serializer_class : Сериализатор для преобразования объектов курса в JSON и наоборот.
                 pagination_class : Пагинатор, для отображения курсов.
+                filter_backends : Полнотекстовый поиск по параметру ?search=.
+                throttle_scope : Отдельное ограничение частоты запросов к курсам.
     """
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     pagination_class = CoursePaginator
+    filter_backends = [FullTextSearchFilter]
+    throttle_scope = 'course'
 
-    def perform_update(self, serializer):
-        updated_course = serializer.save()
-        course_update_mail(updated_course)
+    @read_from_replica()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     def get_permissions(self):
         action_permissions = {
@@ -105,6 +141,35 @@ class CourseViewSet(viewsets.ModelViewSet):
         return [permission() for permission in action_permissions.get(self.action, default_permissions)]
 
 
+class SearchAPIView(APIView):
+    """
+        Полнотекстовый поиск по курсам и урокам.
+
+        Параметры:
+            search : Поисковый запрос.
+
+        Returns:
+            Response: Найденные курсы и уроки, упорядоченные по релевантности.
+                HTTP_400_BAD_REQUEST: Не указан поисковый запрос.
+    """
+    permission_classes = [IsAuthenticated]
+    results_limit = 20
+
+    @read_from_replica()
+    def get(self, request):
+        term = request.query_params.get('search', '').strip()
+        if not term:
+            return Response({'detail': 'Укажите поисковый запрос'}, status=status.HTTP_400_BAD_REQUEST)
+
+        courses = search_queryset(Course.objects.all(), term)[:self.results_limit]
+        lessons = search_queryset(Lesson.objects.all(), term)[:self.results_limit]
+
+        return Response({
+            'courses': CourseSearchSerializer(courses, many=True).data,
+            'lessons': LessonSearchSerializer(lessons, many=True).data,
+        })
+
+
 class PaymentListAPIView(generics.ListAPIView):
     """
            Представление для взаимодействия с платежом.
@@ -121,6 +186,10 @@ class PaymentListAPIView(generics.ListAPIView):
     filterset_class = PaymentFilter
     permission_classes = [IsAuthenticated]
 
+    @read_from_replica()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class SubscribeCourseView(generics.CreateAPIView):
     """
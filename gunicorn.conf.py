@@ -0,0 +1,21 @@
+import multiprocessing
+import os
+
+# Синхронные gthread-воркеры (WSGI) держат постоянные соединения с базой;
+# uvicorn-воркеры (ASGI) нужны для асинхронных эндпоинтов, соединения для них пулит pgbouncer.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+wsgi_app = 'DRF.asgi:application' if worker_class == 'uvicorn.workers.UvicornWorker' else 'DRF.wsgi:application'
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Перезапуск воркеров ограничивает рост памяти; разброс не даёт им перезапуститься одновременно
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = 100
+
+accesslog = '-'
@@ -6,6 +6,8 @@ import sys
 
 def main():
     """Run administrative tasks."""
+    if len(sys.argv) > 1 and sys.argv[1] in ('test', 'test_coverage'):
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DRF.settings_test')
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DRF.settings')
     try:
         from django.core.management import execute_from_command_line
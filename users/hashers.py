@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+            PBKDF2-хешер, число итераций которого задаётся настройкой PASSWORD_PBKDF2_ITERATIONS.
+
+            Алгоритм совпадает с стандартным pbkdf2_sha256, поэтому существующие хеши остаются валидными,
+            а при изменении настройки пароль перехешируется при следующем успешном входе.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
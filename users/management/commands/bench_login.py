@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Замеряет пропускную способность эндпоинта входа (входов в секунду на одно ядро).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--no-session', action='store_true', help='Входить без создания сессии.')
+
+    def handle(self, *args, **options):
+        email = 'bench-login@example.com'
+        password = 'bench-login-password'
+        data = {'email': email, 'password': password, 'session': not options['no_session']}
+        url = reverse('users:user-login')
+        client = APIClient(HTTP_HOST='localhost')
+
+        # Ограничение частоты входов отключено, все записи бенчмарка откатываются в конце
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}), \
+                transaction.atomic():
+            user = User(email=email)
+            user.set_password(password)
+            user.save()
+
+            for _ in range(options['warmup']):
+                client.post(url, data, format='json')
+
+            iterations = options['iterations']
+            wall_started, cpu_started = time.perf_counter(), time.process_time()
+            for _ in range(iterations):
+                response = client.post(url, data, format='json')
+                if response.status_code != 200:
+                    raise RuntimeError(f'Неожиданный ответ {response.status_code}')
+            wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'входов: {iterations}, сессия: {data["session"]}')
+        self.stdout.write(f'входов/с: {iterations / wall:.1f}, мс/вход: {wall / iterations * 1000:.2f}')
+        self.stdout.write(f'входов/с на ядро (по CPU-времени): {iterations / cpu:.1f}')
@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils.translation import gettext_lazy
 
+from DRF.images import has_new_upload, schedule_image_variants
+
 
 class UserRoles(models.TextChoices):
     MEMBER = 'member', gettext_lazy('member')
@@ -12,9 +14,16 @@ class User(AbstractUser):
     username = None
     email = models.EmailField(unique=True, verbose_name='Email')
     avatar = models.ImageField(upload_to='users/', null=True, blank=True, verbose_name='Аватар')
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Аватар(размеры)')
     phone = models.CharField(max_length=20, verbose_name='Телефон')
     country = models.CharField(max_length=20, verbose_name='Страна')
     role = models.CharField(max_length=10, choices=UserRoles.choices, default=UserRoles.MEMBER)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
+
+    def save(self, *args, **kwargs):
+        avatar_uploaded = has_new_upload(self.avatar)
+        super().save(*args, **kwargs)
+        if avatar_uploaded:
+            schedule_image_variants(self, 'avatar')
@@ -1,16 +1,22 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
 
+from DRF.images import ImageVariantsField, StreamingImageField
+
 
 class UserSerializer(serializers.ModelSerializer):
+    avatar = StreamingImageField(required=False, allow_null=True)
+    avatar_variants = ImageVariantsField('avatar')
+
     class Meta:
         model = get_user_model()
-        fields = ['id', 'email', 'first_name', 'last_name', 'avatar', 'phone', 'country']
+        fields = ['id', 'email', 'first_name', 'last_name', 'avatar', 'avatar_variants', 'phone', 'country']
 
 
 class UserLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(style={'input_type': 'password'}, trim_whitespace=False)
+    session = serializers.BooleanField(default=True)
 
     def validate(self, data):
         email = data.get('email')
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+AUTH_TOKEN_CACHE_KEY = 'users:auth_token:{}'
+
+
+def get_auth_token(user):
+    """Возвращает ключ токена пользователя, обращаясь к базе только при промахе кеша."""
+    if not settings.AUTH_TOKEN_CACHE_ENABLED:
+        token, created = Token.objects.get_or_create(user=user)
+        return token.key
+
+    cache_key = AUTH_TOKEN_CACHE_KEY.format(user.pk)
+    token_key = cache.get(cache_key)
+
+    if token_key is None:
+        token, created = Token.objects.get_or_create(user=user)
+        token_key = token.key
+        cache.set(cache_key, token_key, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+    return token_key
+
+
+def invalidate_auth_token(user_id):
+    cache.delete(AUTH_TOKEN_CACHE_KEY.format(user_id))
+
+
+def update_last_login(user):
+    """Обновляет last_login не чаще, чем раз в LAST_LOGIN_UPDATE_INTERVAL."""
+    now = timezone.now()
+
+    if user.last_login is None or now - user.last_login >= settings.LAST_LOGIN_UPDATE_INTERVAL:
+        user.last_login = now
+        user.save(update_fields=['last_login'])
@@ -1,3 +1,115 @@
-from django.test import TestCase
+from unittest.mock import MagicMock, patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .services import AUTH_TOKEN_CACHE_KEY
+
+User = get_user_model()
+
+
+class UserLoginTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User(email='test@mail.ru')
+        self.user.set_password('test1234')
+        self.user.save()
+        self.url = reverse('users:user-login')
+
+    def test_login_with_session(self):
+        response = self.client.post(self.url, {'email': 'test@mail.ru', 'password': 'test1234'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token'], Token.objects.get(user=self.user).key)
+        self.assertIn('sessionid', response.cookies)
+
+    def test_login_without_session(self):
+        data = {'email': 'test@mail.ru', 'password': 'test1234', 'session': False}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('sessionid', response.cookies)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_repeated_login_reuses_cached_token(self):
+        data = {'email': 'test@mail.ru', 'password': 'test1234', 'session': False}
+        first = self.client.post(self.url, data, format='json')
+
+        # Повторный вход: только выборка пользователя, без записи токена и last_login
+        with self.assertNumQueries(1):
+            second = self.client.post(self.url, data, format='json')
+        self.assertEqual(first.data['token'], second.data['token'])
+
+    def test_deleted_token_is_not_served_from_cache(self):
+        data = {'email': 'test@mail.ru', 'password': 'test1234', 'session': False}
+        first = self.client.post(self.url, data, format='json')
+        Token.objects.filter(user=self.user).delete()
+
+        second = self.client.post(self.url, data, format='json')
+        self.assertNotEqual(first.data['token'], second.data['token'])
+
+    @override_settings(AUTH_TOKEN_CACHE_ENABLED=False)
+    def test_token_is_not_cached_without_shared_cache(self):
+        data = {'email': 'test@mail.ru', 'password': 'test1234', 'session': False}
+        first = self.client.post(self.url, data, format='json')
+
+        # Без общего кеша токен каждый раз берётся из базы
+        with self.assertNumQueries(2):
+            second = self.client.post(self.url, data, format='json')
+        self.assertEqual(first.data['token'], second.data['token'])
+        self.assertIsNone(cache.get(AUTH_TOKEN_CACHE_KEY.format(self.user.pk)))
+
+    def test_invalid_credentials(self):
+        response = self.client.post(self.url, {'email': 'test@mail.ru', 'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-login')
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK,
+                                       'DEFAULT_THROTTLE_RATES': {'anon': '100/min', 'login': '2/min'}})
+    def test_login_is_throttled_per_ip(self):
+        data = {'email': 'test@mail.ru', 'password': 'wrong'}
+        for _ in range(2):
+            response = self.client.post(self.url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertLessEqual(int(response['Retry-After']), 60)
+
+        response = self.client.post(self.url, data, format='json', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK,
+                                       'DEFAULT_THROTTLE_RATES': {'anon': '100/min', 'login': '2/h'}})
+    def test_redis_checks_all_windows_in_one_script_call(self):
+        data = {'email': 'test@mail.ru', 'password': 'wrong'}
+        script = MagicMock(side_effect=[0, 1500])
+
+        with patch('DRF.throttling.get_redis_client', return_value=MagicMock()) as get_redis_client, \
+                patch('DRF.throttling._sliding_window_script', script):
+            allowed = self.client.post(self.url, data, format='json')
+            throttled = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(allowed.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(throttled.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # Ожидание из скрипта приходит в миллисекундах и округляется вверх до секунд
+        self.assertEqual(throttled['Retry-After'], '2')
+
+        self.assertEqual(script.call_count, 2)
+        call = script.call_args_list[0].kwargs
+        self.assertEqual(call['client'], get_redis_client.return_value)
+        self.assertEqual(call['keys'], ['throttle_anon_127.0.0.1', 'throttle_login_127.0.0.1'])
+        # ARGV: время, уникальный член окна, затем пара (лимит, окно в мс) на каждый ключ
+        now, member, *windows = call['args']
+        self.assertTrue(member.startswith(f'{now}-'))
+        self.assertEqual(windows, [100, 60 * 1000, 2, 60 * 60 * 1000])
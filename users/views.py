@@ -1,8 +1,8 @@
 from rest_framework import status, viewsets
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
 from django.contrib.auth import login
 from .serializers import UserLoginSerializer, UserSerializer
+from .services import get_auth_token, update_last_login
 
 
 class UserLoginViewSet(viewsets.ViewSet):
@@ -11,22 +11,28 @@ class UserLoginViewSet(viewsets.ViewSet):
 
             Атрибуты:
                 serializer_class : Сериализатор для аутентификации.
+                throttle_scope : Отдельное ограничение частоты попыток входа (хеширование пароля дорогое).
 
             Методы:
                 create: Создания токена и возврата данных пользователя вместе с токеном.
+                    При session=false сессия не создаётся (режим для API-клиентов).
 
             Returns:
                 Response: Ответ от сервера с токеном и данными пользователя.
     """
     serializer_class = UserLoginSerializer
+    throttle_scope = 'login'
 
     def create(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
 
         user = serializer.validated_data['user']
-        login(request, user)
-        token, created = Token.objects.get_or_create(user=user)
+        if serializer.validated_data['session']:
+            login(request, user)
+        else:
+            update_last_login(user)
+        token = get_auth_token(user)
         user_serializer = UserSerializer(user)
 
-        return Response({'token': token.key, 'user': user_serializer.data}, status=status.HTTP_200_OK)
+        return Response({'token': token, 'user': user_serializer.data}, status=status.HTTP_200_OK)